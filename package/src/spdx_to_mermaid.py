@@ -8,18 +8,41 @@ relationships, and annotations.
 """
 
 import argparse
+import functools
+import io
+import itertools
 import json
+import mmap
+import os
 import re
+import stat
 import sys
 import tempfile
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Set
-from spdx_tools.spdx.parser.parse_anything import parse_file
-from spdx_tools.spdx.model.document import Document
-from spdx_tools.spdx.model.package import Package
-from spdx_tools.spdx.model.file import File
-from spdx_tools.spdx.model.snippet import Snippet
-from spdx_tools.spdx.model.relationship import Relationship
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, TextIO, Tuple, Union
+
+# spdx-tools is imported lazily where a file is actually parsed with it:
+# importing its parsers pulls in rdflib, beartype and every model module,
+# which costs ~0.25s of startup the default JSON path never needs
+if TYPE_CHECKING:
+    from spdx_tools.spdx.model.document import Document
+    from spdx_tools.spdx.model.package import Package
+    from spdx_tools.spdx.model.file import File
+    from spdx_tools.spdx.model.snippet import Snippet
+
+try:
+    import orjson
+except ImportError:  # optional speedup, install with the "fast" extra
+    orjson = None
+
+# Shape of an ISO 8601 timestamp without timezone once every digit has been
+# mapped to b'0' by _DIGIT_MASK, e.g. "2025-11-27T15:17:19"
+_TIMESTAMP_SHAPE = b'"0000-00-00T00:00:00"'
+_DIGIT_MASK = bytes.maketrans(b'0123456789', b'0000000000')
+
+# Buffer size for streaming reads/writes of large SPDX files
+_IO_BUFFER_SIZE = 1 << 20
 
 
 def sanitize_node_id(spdx_id) -> str:
@@ -28,16 +51,73 @@ def sanitize_node_id(spdx_id) -> str:
     Replace special characters with underscores.
     Handles both string IDs and special SPDX objects like SpdxNoAssertion.
     """
-    # Convert to string first to handle special SPDX objects
+    # Convert to string first to handle special SPDX objects; str() of a str
+    # returns it as is, so an isinstance guard here buys nothing
     spdx_id_str = str(spdx_id)
+    # Chained str.replace is deliberate: each call is a fast C substring scan
+    # that returns its input unchanged when nothing matches, whereas
+    # str.translate does a per-character table lookup and measures several
+    # times slower on typical SPDX IDs, even combined with removeprefix.
     return spdx_id_str.replace("SPDXRef-", "").replace("-", "_").replace(".", "_")
 
 
-def escape_quotes(text: str) -> str:
-    """Escape quotes in text for Mermaid."""
+def _lookup_node_id(node_ids: Dict[str, str], spdx_id) -> str:
+    """
+    Return the Mermaid node ID for an SPDX ID, reusing an already sanitized one.
+
+    String IDs missing from `node_ids`, such as external document references,
+    are sanitized once and added to it. Special SPDX objects like
+    SpdxNoAssertion are not hashable and are sanitized on every call.
+    """
+    if isinstance(spdx_id, str):
+        node_id = node_ids.get(spdx_id)
+        if node_id is None:
+            node_id = node_ids[spdx_id] = sanitize_node_id(spdx_id)
+        return node_id
+    return sanitize_node_id(spdx_id)
+
+
+def escape_quotes(text: Any) -> str:
+    """Escape quotes in text for Mermaid, converting non-string values with str()."""
+    if type(text) is not str:
+        text = str(text)
+    # Most SPDX fields contain no quotes; skip the replace call entirely
+    if '"' not in text:
+        return text
     return text.replace('"', "'")
 
 
+def _truncate_escape(text: Any, limit: int) -> str:
+    """Escape quotes in text and truncate it to at most limit characters."""
+    # Inlined escape_quotes: this runs for most label fields
+    if type(text) is not str:
+        text = str(text)
+    if '"' in text:
+        text = text.replace('"', "'")
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _timestamp_fix_offsets(data) -> Iterator[int]:
+    """
+    Yield the offsets in raw JSON at which a 'Z' suffix must be inserted.
+
+    Matches "2025-11-27T15:17:19" but not "2025-11-27T15:17:19Z". Scans for
+    the 'T' separator with find() and checks the fixed-width shape around
+    it, so `data` can be bytes or an mmap.
+    """
+    i = data.find(b'T', 11)
+    while i >= 0:
+        if (
+            data[i - 11:i + 10].translate(_DIGIT_MASK) == _TIMESTAMP_SHAPE
+            and data[i + 10:i + 11] != b'Z'
+        ):
+            yield i + 9
+            # The next timestamp's opening quote must follow this closing one
+            i = data.find(b'T', i + 21)
+        else:
+            i = data.find(b'T', i + 1)
+
+
 def preprocess_spdx_file(file_path: Path) -> Path:
     """
     Preprocess SPDX JSON file to fix common compatibility issues.
@@ -55,55 +135,254 @@ def preprocess_spdx_file(file_path: Path) -> Path:
     if file_path.suffix.lower() != '.json':
         return file_path
 
+    tmp_path = None
     try:
-        # Read the file
-        content = file_path.read_text()
-
-        # Check if we need to fix timestamps
-        # Pattern: ISO 8601 timestamp without timezone (missing Z)
-        # Example: "2025-11-27T15:17:19" should be "2025-11-27T15:17:19Z"
-        needs_fix = False
-
-        # Look for timestamps that are missing the Z suffix
-        # Match: "2025-11-27T15:17:19" but not "2025-11-27T15:17:19Z"
-        timestamp_pattern = r'"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})"(?!Z)'
-
-        if re.search(timestamp_pattern, content):
-            needs_fix = True
-
-        if not needs_fix:
-            return file_path
-
-        # Fix timestamps by adding Z suffix
-        fixed_content = re.sub(
-            timestamp_pattern,
-            r'"\1Z"',
-            content
-        )
-
-        # Write to temp file
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.json',
-            delete=False,
-            prefix='spdx_preprocessed_'
-        ) as tmp:
-            tmp.write(fixed_content)
-            tmp_path = Path(tmp.name)
+        with open(file_path, 'rb') as src:
+            if os.fstat(src.fileno()).st_size == 0:
+                return file_path
+
+            # Scan the file through the page cache rather than reading it into
+            # memory, which also bounds memory for single-line (minified)
+            # SBOMs; no temp file is written unless something needs fixing
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets = _timestamp_fix_offsets(data)
+                first = next(offsets, None)
+                if first is None:
+                    return file_path
+
+                with memoryview(data) as view, \
+                        tempfile.NamedTemporaryFile(
+                            mode='wb',
+                            suffix='.json',
+                            delete=False,
+                            prefix='spdx_preprocessed_',
+                            buffering=_IO_BUFFER_SIZE
+                        ) as tmp:
+                    tmp_path = Path(tmp.name)
+                    # Copy the unchanged spans straight from the mapping
+                    cursor = 0
+                    for offset in itertools.chain((first,), offsets):
+                        tmp.write(view[cursor:offset])
+                        tmp.write(b'Z')
+                        cursor = offset
+                    tmp.write(view[cursor:])
 
         return tmp_path
 
     except Exception as e:
         # If preprocessing fails, return original file
         print(f"Warning: Could not preprocess file: {e}", file=sys.stderr)
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
         return file_path
 
 
-def format_node_label(
-    element_id: str, element_data: Dict[str, Any], element_type: str, compact: bool = False, exclude_external_refs: bool = False
-) -> str:
+def _parse_spdx_file(file_path: Path) -> "Document":
     """
-    Format a comprehensive node label showing all available data from the element.
+    Parse an SPDX file in any format with spdx-tools.
+
+    JSON input is run through preprocess_spdx_file first; the temp file it
+    may create is removed once parsed.
+    """
+    from spdx_tools.spdx.parser.parse_anything import parse_file
+
+    processed_file = preprocess_spdx_file(file_path)
+    try:
+        return parse_file(str(processed_file))
+    finally:
+        if processed_file != file_path:
+            processed_file.unlink()
+
+
+def _append_name(out: List[str], element_id: str, element_data: Dict[str, Any]) -> None:
+    """Append the element name, falling back to its SPDX ID."""
+    name = element_data.get("name")
+    if name:
+        out.append(f"\nName: {escape_quotes(name)}")
+    else:
+        out.append(f"\nID: {escape_quotes(element_id)}")
+
+
+def _append_checksums(out: List[str], checksums: Any) -> None:
+    """Append up to two truncated checksums."""
+    if isinstance(checksums, list) and checksums:
+        for checksum in checksums[:2]:  # Limit to first 2 checksums
+            if isinstance(checksum, dict):
+                algo = checksum.get("algorithm", "")
+                value = str(checksum.get("checksumValue", ""))[:12]  # Truncate
+                out.append(f"\n{algo}: {value}...")
+
+
+def _label_document(
+    out: List[str], element_id: str, element_data: Dict[str, Any], compact: bool, exclude_external_refs: bool
+) -> None:
+    """Append the label lines for the SPDX document node."""
+    get = element_data.get
+    out.append("[Document]")
+    _append_name(out, element_id, element_data)
+
+    if version := get("version"):
+        out.append(f"\nVersion: {escape_quotes(version)}")
+
+    if compact:
+        return
+
+    if created := get("created"):
+        out.append(f"\nCreated: {escape_quotes(created)}")
+    if creators := get("creators"):
+        if not isinstance(creators, str):
+            creators = ", ".join(map(str, creators))
+        out.append(f"\nCreators: {_truncate_escape(creators, 50)}")
+    if namespace := get("namespace"):
+        out.append(f"\nNamespace: {_truncate_escape(namespace, 50)}")
+    if data_license := get("dataLicense"):
+        out.append(f"\nData License: {escape_quotes(data_license)}")
+
+
+def _append_common_fields(out: List[str], get: Callable[[str], Any], element_data: Dict[str, Any], compact: bool) -> None:
+    """Append the label lines shared by packages and elements of other types."""
+    if summary := get("summary"):
+        out.append(f"\nSummary: {_truncate_escape(summary, 60)}")
+    if version := get("version"):
+        out.append(f"\nVersion: {escape_quotes(version)}")
+    if license_concluded := get("licenseConcluded"):
+        out.append(f"\nLicense: {escape_quotes(license_concluded)}")
+    if license_comments := get("licenseComments"):
+        out.append(f"\nLicense Note: {_truncate_escape(license_comments, 60)}")
+
+    # In compact mode, skip optional fields
+    if compact:
+        return
+
+    if download_location := get("downloadLocation"):
+        out.append(f"\nDownload: {_truncate_escape(download_location, 50)}")
+    if supplier := get("supplier"):
+        out.append(f"\nSupplier: {escape_quotes(supplier)}")
+    if originator := get("originator"):
+        out.append(f"\nOriginator: {escape_quotes(originator)}")
+    if "filesAnalyzed" in element_data:
+        out.append(f"\nFiles Analyzed: {element_data['filesAnalyzed']}")
+    if verification_code := get("verificationCode"):
+        out.append(f"\nVerification: {verification_code}")
+    _append_checksums(out, get("checksums"))
+    if copyright_text := get("copyrightText"):
+        out.append(f"\nCopyright: {_truncate_escape(copyright_text, 40)}")
+    if comment := get("comment"):
+        out.append(f"\nComment: {_truncate_escape(comment, 50)}")
+    if homepage := get("homepage"):
+        out.append(f"\nHomepage: {escape_quotes(homepage)}")
+
+
+def _label_package(
+    out: List[str], element_id: str, element_data: Dict[str, Any], compact: bool, exclude_external_refs: bool
+) -> None:
+    """Append the label lines for a package node."""
+    get = element_data.get
+
+    # Add type header with purpose if available
+    if purpose := get("primaryPackagePurpose"):
+        out.append(f"[Package - {purpose}]")
+    else:
+        out.append("[Package]")
+
+    _append_name(out, element_id, element_data)
+    _append_common_fields(out, get, element_data, compact)
+
+    # In compact mode, skip optional fields
+    if not compact:
+        if license_declared := get("licenseDeclared"):
+            out.append(f"\nLicense Declared: {escape_quotes(license_declared)}")
+        if package_file_name := get("packageFileName"):
+            out.append(f"\nPackage File: {_truncate_escape(package_file_name, 50)}")
+
+    # Only show external refs if not excluded
+    if not exclude_external_refs and (external_refs := get("externalRefs")):
+        limit = 1 if compact else 2  # Show fewer in compact mode
+        for ref in external_refs[:limit]:
+            if isinstance(ref, dict):
+                ref_type = ref.get("referenceType", "")
+                ref_loc = _truncate_escape(ref.get("referenceLocator", ""), 40)
+                out.append(f"\n{ref_type}: {ref_loc}")
+
+
+def _label_file(
+    out: List[str], element_id: str, element_data: Dict[str, Any], compact: bool, exclude_external_refs: bool
+) -> None:
+    """Append the label lines for a file node."""
+    get = element_data.get
+    out.append("[File]")
+    _append_name(out, element_id, element_data)
+
+    if license_concluded := get("licenseConcluded"):
+        out.append(f"\nLicense: {escape_quotes(license_concluded)}")
+
+    if compact:
+        return
+
+    _append_checksums(out, get("checksums"))
+    if copyright_text := get("copyrightText"):
+        out.append(f"\nCopyright: {_truncate_escape(copyright_text, 40)}")
+    if comment := get("comment"):
+        out.append(f"\nComment: {_truncate_escape(comment, 50)}")
+
+
+def _label_snippet(
+    out: List[str], element_id: str, element_data: Dict[str, Any], compact: bool, exclude_external_refs: bool
+) -> None:
+    """Append the label lines for a snippet node."""
+    get = element_data.get
+    out.append("[Snippet]")
+    _append_name(out, element_id, element_data)
+
+    if license_concluded := get("licenseConcluded"):
+        out.append(f"\nLicense: {escape_quotes(license_concluded)}")
+
+    if compact:
+        return
+
+    if copyright_text := get("copyrightText"):
+        out.append(f"\nCopyright: {_truncate_escape(copyright_text, 40)}")
+    if comment := get("comment"):
+        out.append(f"\nComment: {_truncate_escape(comment, 50)}")
+
+
+def _label_generic(
+    out: List[str], element_type: str, element_id: str, element_data: Dict[str, Any], compact: bool
+) -> None:
+    """Append the label lines for an element of a type without its own builder."""
+    get = element_data.get
+
+    if purpose := get("primaryPackagePurpose"):
+        out.append(f"[{element_type} - {purpose}]")
+    else:
+        out.append(f"[{element_type}]")
+
+    _append_name(out, element_id, element_data)
+    _append_common_fields(out, get, element_data, compact)
+
+
+# Label builder per element type, each specialized for that type's fields;
+# other types fall back to _label_generic
+_LABEL_BUILDERS = {
+    "Document": _label_document,
+    "Package": _label_package,
+    "File": _label_file,
+    "Snippet": _label_snippet,
+}
+
+
+def _append_node_label(
+    out: List[str], element_id: str, element_data: Dict[str, Any], element_type: str, compact: bool = False, exclude_external_refs: bool = False
+) -> None:
+    """
+    Append a comprehensive node label showing all available data from the element.
+
+    Label lines are appended as fragments directly to `out`, each line after
+    the first prefixed with its newline, so callers can splice the label into
+    a larger buffer without building and joining an intermediate string.
+    The fields shown depend on the element type; see _LABEL_BUILDERS. Types
+    without a builder get the common fields via _label_generic, and non-string
+    field values are converted with str().
 
     NOTE: This function generates PLAIN TEXT labels only (no HTML formatting).
     HTML tags like <b>, <font>, and <br/> are NOT supported when mermaid's
@@ -118,388 +397,710 @@ def format_node_label(
     - All text is now uniform weight and color
 
     Args:
+        out: List to append the label fragments to
         element_id: The SPDX element ID
         element_data: Dictionary containing element data
         element_type: Type of the element (Document, Package, File, Snippet)
         compact: If True, only show essential fields
         exclude_external_refs: If True, skip external references (CPE, PURL)
     """
-    lines = []
-
-    # Add type header with purpose if available
-    if "primaryPackagePurpose" in element_data and element_data["primaryPackagePurpose"]:
-        purpose = element_data["primaryPackagePurpose"]
-        lines.append(f"[{element_type} - {purpose}]")
+    builder = _LABEL_BUILDERS.get(element_type)
+    if builder is None:
+        _label_generic(out, element_type, element_id, element_data, compact)
     else:
-        lines.append(f"[{element_type}]")
+        builder(out, element_id, element_data, compact, exclude_external_refs)
 
-    # Add name/ID (plain text - no HTML formatting)
-    if "name" in element_data and element_data["name"]:
-        lines.append(f"Name: {escape_quotes(str(element_data['name']))}")
-    else:
-        lines.append(f"ID: {escape_quotes(element_id)}")
-
-    # Add summary if available (plain text - no HTML formatting)
-    if "summary" in element_data and element_data["summary"]:
-        summary = escape_quotes(str(element_data["summary"]))
-        if len(summary) > 60:
-            summary = summary[:57] + "..."
-        lines.append(f"Summary: {summary}")
-
-    # Add version if available (plain text - no HTML formatting)
-    if "version" in element_data and element_data["version"]:
-        lines.append(f"Version: {escape_quotes(str(element_data['version']))}")
-
-    # Add license info (plain text - no HTML formatting)
-    if "licenseConcluded" in element_data and element_data["licenseConcluded"]:
-        lines.append(f"License: {escape_quotes(str(element_data['licenseConcluded']))}")
-
-    # Add license comments if available
-    if "licenseComments" in element_data and element_data["licenseComments"]:
-        lic_comment = escape_quotes(str(element_data["licenseComments"]))
-        if len(lic_comment) > 60:
-            lic_comment = lic_comment[:57] + "..."
-        lines.append(f"License Note: {lic_comment}")
 
-    # In compact mode, skip optional fields
-    if not compact:
-        # Add download location for packages (plain text - no HTML formatting)
-        if "downloadLocation" in element_data and element_data["downloadLocation"]:
-            download = escape_quotes(str(element_data["downloadLocation"]))
-            if len(download) > 50:
-                download = download[:47] + "..."
-            lines.append(f"Download: {download}")
-
-        # Add supplier if available (plain text - no HTML formatting)
-        if "supplier" in element_data and element_data["supplier"]:
-            lines.append(f"Supplier: {escape_quotes(str(element_data['supplier']))}")
-
-        # Add originator if available (plain text - no HTML formatting)
-        if "originator" in element_data and element_data["originator"]:
-            lines.append(f"Originator: {escape_quotes(str(element_data['originator']))}")
-
-        # Add files analyzed status (plain text - no HTML formatting)
-        if "filesAnalyzed" in element_data:
-            lines.append(f"Files Analyzed: {element_data['filesAnalyzed']}")
-
-        # Add verification code if present (plain text - no HTML formatting)
-        if "verificationCode" in element_data and element_data["verificationCode"]:
-            lines.append(f"Verification: {element_data['verificationCode']}")
-
-        # Add checksums if available (plain text - no HTML formatting)
-        if "checksums" in element_data and element_data["checksums"]:
-            checksums = element_data["checksums"]
-            if isinstance(checksums, list) and checksums:
-                for checksum in checksums[:2]:  # Limit to first 2 checksums
-                    if isinstance(checksum, dict):
-                        algo = checksum.get("algorithm", "")
-                        value = checksum.get("checksumValue", "")[:12]  # Truncate
-                        lines.append(f"{algo}: {value}...")
-
-        # Add copyright if available (plain text - no HTML formatting)
-        if "copyrightText" in element_data and element_data["copyrightText"]:
-            copyright_text = escape_quotes(str(element_data["copyrightText"]))
-            if len(copyright_text) > 40:
-                copyright_text = copyright_text[:37] + "..."
-            lines.append(f"Copyright: {copyright_text}")
-
-        # Add comment if present (plain text - no HTML formatting)
-        if "comment" in element_data and element_data["comment"]:
-            comment = escape_quotes(str(element_data["comment"]))
-            if len(comment) > 50:
-                comment = comment[:47] + "..."
-            lines.append(f"Comment: {comment}")
-
-        # Add homepage if available (plain text - no HTML formatting)
-        if "homepage" in element_data and element_data["homepage"]:
-            lines.append(f"Homepage: {escape_quotes(str(element_data['homepage']))}")
-
-    # Add document-specific fields (plain text - no HTML formatting)
-    if element_type == "Document" and not compact:
-        if "created" in element_data and element_data["created"]:
-            lines.append(f"Created: {escape_quotes(str(element_data['created']))}")
-        if "creators" in element_data and element_data["creators"]:
-            creators_str = ", ".join(element_data["creators"])
-            if len(creators_str) > 50:
-                creators_str = creators_str[:47] + "..."
-            lines.append(f"Creators: {escape_quotes(creators_str)}")
-        if "namespace" in element_data and element_data["namespace"]:
-            namespace = escape_quotes(str(element_data["namespace"]))
-            if len(namespace) > 50:
-                namespace = namespace[:47] + "..."
-            lines.append(f"Namespace: {namespace}")
-        if "dataLicense" in element_data and element_data["dataLicense"]:
-            lines.append(f"Data License: {escape_quotes(str(element_data['dataLicense']))}")
-
-    # Add package-specific fields (plain text - no HTML formatting)
-    if element_type == "Package":
-        if not compact and "licenseDeclared" in element_data and element_data["licenseDeclared"]:
-            lines.append(f"License Declared: {escape_quotes(str(element_data['licenseDeclared']))}")
-        if not compact and "packageFileName" in element_data and element_data["packageFileName"]:
-            pkg_file = escape_quotes(str(element_data["packageFileName"]))
-            if len(pkg_file) > 50:
-                pkg_file = pkg_file[:47] + "..."
-            lines.append(f"Package File: {pkg_file}")
-        # Only show external refs if not excluded (plain text - no HTML formatting)
-        if not exclude_external_refs and "externalRefs" in element_data and element_data["externalRefs"]:
-            limit = 1 if compact else 2  # Show fewer in compact mode
-            for ref in element_data["externalRefs"][:limit]:
-                if isinstance(ref, dict):
-                    ref_type = ref.get("referenceType", "")
-                    ref_loc = ref.get("referenceLocator", "")
-                    if len(ref_loc) > 40:
-                        ref_loc = ref_loc[:37] + "..."
-                    lines.append(f"{ref_type}: {escape_quotes(ref_loc)}")
-
-    # Join all lines with actual newlines for plain text labels
-    # NOTE: When htmlLabels is false, we need ACTUAL newline characters, not escape sequences
-    # The escape sequence "\n" renders as literal \n text when htmlLabels: false
-    return "\n".join(lines)
-
-
-def extract_elements_from_document(doc: Document) -> Dict[str, Dict[str, Any]]:
+def format_node_label(
+    element_id: str, element_data: Dict[str, Any], element_type: str, compact: bool = False, exclude_external_refs: bool = False
+) -> str:
     """
-    Extract all elements (packages, files, snippets) from the SPDX document.
+    Format a comprehensive node label showing all available data from the element.
+
+    See _append_node_label for the fields shown and the plain text format.
     """
-    elements = {}
+    out: List[str] = []
+    _append_node_label(out, element_id, element_data, element_type, compact, exclude_external_refs)
+    return "".join(out)
+
+
+# The spdx-tools model classes are dataclasses that define every field on
+# every instance, so the extractors below read attributes directly instead of
+# probing each instance with hasattr/getattr.
 
-    # Add document itself
-    elements["SPDXRef-DOCUMENT"] = {
+
+def _document_data(doc: "Document") -> Dict[str, Any]:
+    """Extract the label data for the SPDX document itself."""
+    creation_info = doc.creation_info
+    return {
         "type": "Document",
-        "name": doc.creation_info.name
-        if hasattr(doc.creation_info, "name")
-        else doc.name,
-        "version": doc.creation_info.spdx_version
-        if hasattr(doc.creation_info, "spdx_version")
-        else None,
-        "namespace": doc.creation_info.document_namespace
-        if hasattr(doc.creation_info, "document_namespace")
+        "name": creation_info.name,
+        "version": creation_info.spdx_version,
+        "namespace": creation_info.document_namespace,
+        "created": str(created)
+        if (created := creation_info.created) is not None
         else None,
-        "created": str(doc.creation_info.created)
-        if hasattr(doc.creation_info, "created")
+        "creators": ", ".join(str(c) for c in creation_info.creators),
+        "dataLicense": creation_info.data_license,
+    }
+
+
+# How _model_fields turns a model attribute into a label data value
+_AS_IS = 0              # copied unchanged
+_OR_NONE = 1            # falsy values become None
+_STR = 2                # str() of truthy values, otherwise None
+_STR_UNLESS_NONE = 3    # str() of anything but None, keeping SpdxNoAssertion/SpdxNone
+
+# (label data key, model attribute, conversion) per element type
+_PKG_FIELDS = (
+    ("name", "name", _AS_IS),
+    ("version", "version", _OR_NONE),
+    ("downloadLocation", "download_location", _STR_UNLESS_NONE),
+    ("filesAnalyzed", "files_analyzed", _AS_IS),
+    ("supplier", "supplier", _STR),
+    ("originator", "originator", _STR),
+    ("homepage", "homepage", _STR),
+    ("licenseConcluded", "license_concluded", _STR_UNLESS_NONE),
+    ("licenseDeclared", "license_declared", _STR_UNLESS_NONE),
+    ("licenseComments", "license_comment", _OR_NONE),
+    ("copyrightText", "copyright_text", _STR),
+    ("comment", "comment", _OR_NONE),
+    ("summary", "summary", _OR_NONE),
+    ("primaryPackagePurpose", "primary_package_purpose", _STR),
+    ("packageFileName", "file_name", _OR_NONE),
+)
+_FILE_FIELDS = (
+    ("name", "name", _AS_IS),
+    ("licenseConcluded", "license_concluded", _STR_UNLESS_NONE),
+    ("copyrightText", "copyright_text", _STR),
+    ("comment", "comment", _OR_NONE),
+)
+_SNIPPET_FIELDS = (
+    ("comment", "comment", _OR_NONE),
+    ("licenseConcluded", "license_concluded", _STR_UNLESS_NONE),
+    ("copyrightText", "copyright_text", _STR),
+)
+
+
+def _model_fields(data: Dict[str, Any], obj: Any, fields: Tuple[Tuple[str, str, int], ...]) -> Dict[str, Any]:
+    """Fill label data from a model object as described by a field table."""
+    for key, attr, conversion in fields:
+        value = getattr(obj, attr)
+        if conversion == _AS_IS:
+            data[key] = value
+        elif conversion == _OR_NONE:
+            data[key] = value or None
+        elif conversion == _STR:
+            data[key] = str(value) if value else None
+        else:
+            data[key] = str(value) if value is not None else None
+    return data
+
+
+def _model_checksums(checksums) -> List[Dict[str, str]]:
+    """Extract checksums from a model element."""
+    return [{"algorithm": str(c.algorithm), "checksumValue": c.value} for c in checksums]
+
+
+def _package_data(package: "Package") -> Dict[str, Any]:
+    """Extract the label data for a single SPDX package."""
+    data = _model_fields({"type": "Package"}, package, _PKG_FIELDS)
+    data["checksums"] = _model_checksums(package.checksums)
+    data["verificationCode"] = (
+        str(verification_code.value)
+        if (verification_code := package.verification_code)
+        else None
+    )
+    data["externalRefs"] = [
+        {
+            "referenceType": str(ref.reference_type),
+            "referenceLocator": ref.locator,
+            "referenceCategory": str(ref.category)
+        }
+        for ref in package.external_references
+    ]
+    return data
+
+
+def _file_data(file: "File") -> Dict[str, Any]:
+    """Extract the label data for a single SPDX file."""
+    data = _model_fields({"type": "File"}, file, _FILE_FIELDS)
+    data["checksums"] = _model_checksums(file.checksums)
+    return data
+
+
+def _snippet_data(snippet: "Snippet") -> Dict[str, Any]:
+    """Extract the label data for a single SPDX snippet."""
+    return _model_fields(
+        {"type": "Snippet", "name": snippet.name or snippet.spdx_id}, snippet, _SNIPPET_FIELDS
+    )
+
+
+def load_spdx_json(file_path: Path) -> Dict[str, Any]:
+    """
+    Load an SPDX JSON file as plain JSON, without building the spdx-tools model.
+
+    The returned dict can be passed anywhere a Document is accepted for
+    diagram generation. Skipping the object model avoids its full per-field
+    validation and quadratic relationship de-duplication, which dominate run
+    time on large SBOMs. The fields the diagram uses are still checked, and
+    license expressions are normalized the way spdx-tools renders them, as
+    elements are extracted; problems raise SPDXParsingError.
+
+    orjson is used when it is installed, as it parses several times faster
+    than the standard library json module.
+
+    Args:
+        file_path: Path to the SPDX JSON file
+
+    Returns:
+        The raw SPDX document as a dict
+    """
+    if orjson is not None:
+        return orjson.loads(Path(file_path).read_bytes())
+    with open(file_path, 'rb', buffering=_IO_BUFFER_SIZE) as f:
+        return json.load(f)
+
+
+def _enum_str(enum_name: str, value: str) -> str:
+    """Render a raw SPDX enum value the way str() renders the spdx-tools enum."""
+    return f"{enum_name}.{value.replace('-', '_').upper()}"
+
+
+def _raise_parsing_error(messages: List[str]) -> None:
+    """Raise the spdx-tools parsing error, so both input paths fail the same way."""
+    from spdx_tools.spdx.parser.error import SPDXParsingError
+
+    raise SPDXParsingError(messages)
+
+
+def _require(element: Any, keys: Tuple[str, ...], context: str) -> None:
+    """Raise SPDXParsingError unless `element` is a dict with all of `keys` set."""
+    if not isinstance(element, dict):
+        _raise_parsing_error([f"Error while parsing {context}: expected an object, got {element!r}"])
+    missing = [key for key in keys if element.get(key) is None]
+    if missing:
+        _raise_parsing_error([f"Error while parsing {context}: missing required field(s): {', '.join(missing)}"])
+
+
+# Required fields per raw element, as enforced by the spdx-tools parser
+_DOCUMENT_REQUIRED = ("SPDXID", "spdxVersion", "name", "documentNamespace", "dataLicense", "creationInfo")
+_CREATION_INFO_REQUIRED = ("created", "creators")
+_PACKAGE_REQUIRED = ("SPDXID", "name", "downloadLocation")
+_FILE_REQUIRED = ("SPDXID", "fileName", "checksums")
+_SNIPPET_REQUIRED = ("SPDXID", "snippetFromFile", "ranges")
+_CHECKSUM_REQUIRED = ("algorithm", "checksumValue")
+_EXTERNAL_REF_REQUIRED = ("referenceCategory", "referenceType", "referenceLocator")
+_RELATIONSHIP_REQUIRED = ("spdxElementId", "relationshipType", "relatedSpdxElement")
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_license(expression: str) -> str:
+    """Render a license expression exactly as spdx-tools does; each distinct one is parsed once."""
+    from license_expression import ExpressionError
+    from spdx_tools.common.spdx_licensing import spdx_licensing
+
+    try:
+        return str(spdx_licensing.parse(expression))
+    except ExpressionError as err:
+        message = f'Error parsing LicenseExpression: "{expression}"'
+        if err.args:
+            message += f": {err.args[0]}"
+        _raise_parsing_error([message])
+
+
+def _raw_license(expression: Any) -> Any:
+    """
+    Render a raw SPDX license expression the way spdx-tools renders it.
+
+    Normalizes NOASSERTION/NONE, and otherwise parses the expression with
+    the SPDX license list, which fixes identifier case, upper-cases the
+    operators and adds parentheses where operator precedence requires them.
+    """
+    if not expression:
+        return None
+    if not isinstance(expression, str):
+        _raise_parsing_error([f"Error parsing LicenseExpression: expected a string, got {expression!r}"])
+    if expression.upper() in ("NOASSERTION", "NONE"):
+        return expression.upper()
+    return _parse_license(expression)
+
+
+# Actor syntax accepted by the spdx-tools actor parser
+_TOOL_RE = re.compile(r"^Tool:\s*(.+)")
+_PERSON_RE = re.compile(r"^Person:\s*(?:(.*)\((.*)\)|(.*))$")
+_ORGANIZATION_RE = re.compile(r"^Organization:\s*(?:(.*)\((.*)\)|(.*))$")
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_actor(actor: str) -> str:
+    """Render an actor exactly as spdx-tools does; each distinct one is parsed once."""
+    if match := _TOOL_RE.match(actor):
+        name = match.group(1).strip()
+        if not name:
+            _raise_parsing_error([f"No name for Tool provided: {actor}."])
+        return f"Tool: {name}"
+
+    if match := _PERSON_RE.match(actor):
+        actor_type = "Person"
+    elif match := _ORGANIZATION_RE.match(actor):
+        actor_type = "Organization"
+    else:
+        _raise_parsing_error([f"Actor {actor} doesn't match any of person, organization or tool."])
+
+    if match.group(3):
+        return f"{actor_type}: {match.group(3).strip()}"
+    name = match.group(1)
+    if not name:
+        _raise_parsing_error([f"No name for Actor provided: {actor}."])
+    email = match.group(2).strip()
+    return f"{actor_type}: {name.strip()} ({email})" if email else f"{actor_type}: {name.strip()}"
+
+
+def _raw_actor(actor: Any) -> str:
+    """
+    Render a raw SPDX actor (supplier, originator or creator) the way
+    spdx-tools renders it, e.g. "Organization:Foo" as "Organization: Foo".
+    """
+    if not isinstance(actor, str):
+        _raise_parsing_error([f"Error while parsing Actor: expected a string, got {actor!r}"])
+    return _parse_actor(actor)
+
+
+def _raw_actor_or_no_assertion(actor: Any) -> Any:
+    """Render a raw supplier or originator, which may also be NOASSERTION."""
+    if not actor:
+        return None
+    if actor == "NOASSERTION":
+        return actor
+    return _raw_actor(actor)
+
+
+def _raw_created(created: Any) -> str:
+    """
+    Render a raw creation timestamp as str() of the datetime spdx-tools
+    parses it to. Only whole-second UTC timestamps are valid; the 'Z' may
+    be missing, as preprocess_spdx_file adds it on the default path.
+    """
+    try:
+        if not isinstance(created, str):
+            raise TypeError(f"expected a string, got {created!r}")
+        return str(datetime.strptime(created.removesuffix("Z"), "%Y-%m-%dT%H:%M:%S"))
+    except (TypeError, ValueError) as err:
+        _raise_parsing_error([f"Error while parsing CreationInfo: created: {err}"])
+
+
+def _raw_checksums(checksums: Any, context: str) -> List[Dict[str, Any]]:
+    """Extract checksums from a raw SPDX element."""
+    if not checksums:
+        return []
+    for c in checksums:
+        _require(c, _CHECKSUM_REQUIRED, f"Checksum of {context}")
+    return [
+        {
+            "algorithm": _enum_str("ChecksumAlgorithm", c["algorithm"]),
+            "checksumValue": c["checksumValue"],
+        }
+        for c in checksums
+    ]
+
+
+def _raw_document_data(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the label data for a raw SPDX JSON document itself."""
+    _require(raw, _DOCUMENT_REQUIRED, "Document")
+    creation_info = raw["creationInfo"]
+    _require(creation_info, _CREATION_INFO_REQUIRED, "CreationInfo")
+    creators = creation_info["creators"]
+    if not isinstance(creators, list):
+        _raise_parsing_error([f"Error while parsing CreationInfo: creators: expected a list, got {creators!r}"])
+    return {
+        "type": "Document",
+        "name": raw.get("name"),
+        "version": raw.get("spdxVersion"),
+        "namespace": raw.get("documentNamespace"),
+        "created": _raw_created(creation_info["created"]),
+        "creators": ", ".join(map(_raw_actor, creators)),
+        "dataLicense": raw.get("dataLicense"),
+    }
+
+
+def _raw_package_data(package: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the label data for a single raw SPDX JSON package."""
+    _require(package, _PACKAGE_REQUIRED, "Package")
+    get = package.get
+    context = f"Package {package['SPDXID']}"
+    external_refs = get("externalRefs") or ()
+    for ref in external_refs:
+        _require(ref, _EXTERNAL_REF_REQUIRED, f"ExternalRef of {context}")
+    files_analyzed = get("filesAnalyzed")
+    purpose = get("primaryPackagePurpose")
+    verification_code = get("packageVerificationCode")
+    return {
+        "type": "Package",
+        "name": get("name"),
+        "version": get("versionInfo") or None,
+        "downloadLocation": get("downloadLocation"),
+        # SPDX defaults filesAnalyzed to true when absent
+        "filesAnalyzed": True if files_analyzed is None else files_analyzed,
+        "supplier": _raw_actor_or_no_assertion(get("supplier")),
+        "originator": _raw_actor_or_no_assertion(get("originator")),
+        "homepage": get("homepage") or None,
+        "licenseConcluded": _raw_license(get("licenseConcluded")),
+        "licenseDeclared": _raw_license(get("licenseDeclared")),
+        "licenseComments": get("licenseComments") or None,
+        "copyrightText": get("copyrightText") or None,
+        "comment": get("comment") or None,
+        "summary": get("summary") or None,
+        "primaryPackagePurpose": _enum_str("PackagePurpose", purpose)
+        if purpose
         else None,
-        "creators": [str(c) for c in doc.creation_info.creators]
-        if hasattr(doc.creation_info, "creators")
-        else [],
-        "dataLicense": doc.creation_info.data_license
-        if hasattr(doc.creation_info, "data_license")
+        "checksums": _raw_checksums(get("checksums"), context),
+        "verificationCode": verification_code.get("packageVerificationCodeValue")
+        if verification_code
         else None,
+        "packageFileName": get("packageFileName") or None,
+        "externalRefs": [
+            {
+                "referenceType": ref["referenceType"],
+                "referenceLocator": ref["referenceLocator"],
+                "referenceCategory": _enum_str("ExternalPackageRefCategory", ref["referenceCategory"]),
+            }
+            for ref in external_refs
+        ],
+    }
+
+
+def _raw_file_data(file: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the label data for a single raw SPDX JSON file."""
+    _require(file, _FILE_REQUIRED, "File")
+    get = file.get
+    return {
+        "type": "File",
+        "name": file["fileName"],
+        "licenseConcluded": _raw_license(get("licenseConcluded")),
+        "copyrightText": get("copyrightText") or None,
+        "comment": get("comment") or None,
+        "checksums": _raw_checksums(file["checksums"], f"File {file['SPDXID']}"),
     }
 
-    # Add packages
-    for package in doc.packages:
-        pkg_data = {
-            "type": "Package",
-            "name": package.name,
-            "version": package.version
-            if hasattr(package, "version") and package.version
-            else None,
-            "downloadLocation": str(package.download_location)
-            if hasattr(package, "download_location")
-            else None,
-            "filesAnalyzed": package.files_analyzed
-            if hasattr(package, "files_analyzed")
-            else None,
-            "supplier": str(package.supplier)
-            if hasattr(package, "supplier") and package.supplier
-            else None,
-            "originator": str(package.originator)
-            if hasattr(package, "originator") and package.originator
-            else None,
-            "homepage": str(package.homepage)
-            if hasattr(package, "homepage") and package.homepage
-            else None,
-            "licenseConcluded": str(package.license_concluded)
-            if hasattr(package, "license_concluded") and package.license_concluded is not None
-            else None,
-            "licenseDeclared": str(package.license_declared)
-            if hasattr(package, "license_declared") and package.license_declared is not None
-            else None,
-            "licenseComments": package.license_comment
-            if hasattr(package, "license_comment") and package.license_comment
-            else None,
-            "copyrightText": str(package.copyright_text)
-            if hasattr(package, "copyright_text") and package.copyright_text
-            else None,
-            "comment": package.comment
-            if hasattr(package, "comment") and package.comment
-            else None,
-            "summary": package.summary
-            if hasattr(package, "summary") and package.summary
-            else None,
-            "primaryPackagePurpose": str(package.primary_package_purpose)
-            if hasattr(package, "primary_package_purpose") and package.primary_package_purpose
-            else None,
-            "checksums": [
-                {"algorithm": str(c.algorithm), "checksumValue": c.value}
-                for c in package.checksums
-            ]
-            if hasattr(package, "checksums") and package.checksums
-            else [],
-            "verificationCode": str(package.verification_code.value)
-            if hasattr(package, "verification_code") and package.verification_code
-            else None,
-            "packageFileName": package.file_name
-            if hasattr(package, "file_name") and package.file_name
-            else None,
-            "externalRefs": [
-                {
-                    "referenceType": str(ref.reference_type) if hasattr(ref, 'reference_type') else str(ref.category),
-                    "referenceLocator": ref.locator if hasattr(ref, 'locator') else str(ref),
-                    "referenceCategory": str(ref.category) if hasattr(ref, 'category') else ""
-                }
-                for ref in package.external_references
-            ]
-            if hasattr(package, "external_references") and package.external_references
-            else [],
-        }
-        elements[package.spdx_id] = pkg_data
 
-    # Add files
+def _raw_snippet_data(snippet: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the label data for a single raw SPDX JSON snippet."""
+    _require(snippet, _SNIPPET_REQUIRED, "Snippet")
+    get = snippet.get
+    return {
+        "type": "Snippet",
+        "name": get("name") or snippet["SPDXID"],
+        "comment": get("comment") or None,
+        "licenseConcluded": _raw_license(get("licenseConcluded")),
+        "copyrightText": get("copyrightText") or None,
+    }
+
+
+def _iter_elements(doc: Union["Document", Dict[str, Any]], max_packages: int = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Lazily yield (SPDX ID, element data) for every element in the document.
+
+    Element data is built one element at a time so callers can stream it
+    without holding a mirror of the whole document in memory.
+
+    Args:
+        doc: The SPDX document to walk, or a raw document from load_spdx_json
+        max_packages: Maximum number of packages to yield (None for all)
+    """
+    if isinstance(doc, dict):
+        yield "SPDXRef-DOCUMENT", _raw_document_data(doc)
+
+        for package in itertools.islice(doc.get("packages") or (), max_packages):
+            element_data = _raw_package_data(package)
+            yield package["SPDXID"], element_data
+
+        for file in doc.get("files") or ():
+            element_data = _raw_file_data(file)
+            yield file["SPDXID"], element_data
+
+        for snippet in doc.get("snippets") or ():
+            element_data = _raw_snippet_data(snippet)
+            yield snippet["SPDXID"], element_data
+        return
+
+    yield "SPDXRef-DOCUMENT", _document_data(doc)
+
+    for package in itertools.islice(doc.packages, max_packages):
+        yield package.spdx_id, _package_data(package)
+
     for file in doc.files:
-        file_data = {
-            "type": "File",
-            "name": file.name,
-            "licenseConcluded": str(file.license_concluded)
-            if hasattr(file, "license_concluded") and file.license_concluded is not None
-            else None,
-            "copyrightText": str(file.copyright_text)
-            if hasattr(file, "copyright_text") and file.copyright_text
-            else None,
-            "comment": file.comment
-            if hasattr(file, "comment") and file.comment
-            else None,
-            "checksums": [
-                {"algorithm": str(c.algorithm), "checksumValue": c.value}
-                for c in file.checksums
-            ]
-            if hasattr(file, "checksums") and file.checksums
-            else [],
-        }
-        elements[file.spdx_id] = file_data
+        yield file.spdx_id, _file_data(file)
 
-    # Add snippets
     for snippet in doc.snippets:
-        snippet_data = {
-            "type": "Snippet",
-            "name": snippet.name
-            if hasattr(snippet, "name") and snippet.name
-            else snippet.spdx_id,
-            "comment": snippet.comment
-            if hasattr(snippet, "comment") and snippet.comment
-            else None,
-            "licenseConcluded": str(snippet.license_concluded)
-            if hasattr(snippet, "license_concluded") and snippet.license_concluded is not None
-            else None,
-            "copyrightText": str(snippet.copyright_text)
-            if hasattr(snippet, "copyright_text") and snippet.copyright_text
-            else None,
-        }
-        elements[snippet.spdx_id] = snippet_data
+        yield snippet.spdx_id, _snippet_data(snippet)
 
-    return elements
 
+def _iter_raw_relationships(raw: Dict[str, Any]) -> Iterator[Tuple[Any, Any, str, Any]]:
+    """
+    Yield the relationships of a raw SPDX JSON document.
 
-def generate_mermaid_diagram(doc: Document, compact: bool = False, max_packages: int = None, exclude_external_refs: bool = False) -> str:
+    Like the spdx-tools parser, this also turns documentDescribes and
+    package hasFiles entries into DESCRIBES and CONTAINS relationships,
+    unless the relationship (or its inverse) is already listed explicitly.
     """
-    Generate a comprehensive Mermaid diagram from an SPDX document.
+    document_describes = raw.get("documentDescribes")
+    packages_with_files = [package for package in raw.get("packages") or () if package.get("hasFiles")]
+    # Explicit relationships only need remembering when there are implied
+    # ones to de-duplicate against, which most generators never emit
+    track_existing = bool(document_describes or packages_with_files)
+
+    existing = set()
+    # Normalized type name per raw type string; documents use only a handful
+    rel_type_names: Dict[str, str] = {}
+    for relationship in raw.get("relationships") or ():
+        _require(relationship, _RELATIONSHIP_REQUIRED, "Relationship")
+        source = relationship["spdxElementId"]
+        target = relationship["relatedSpdxElement"]
+        raw_type = relationship["relationshipType"]
+        rel_type = rel_type_names.get(raw_type)
+        if rel_type is None:
+            rel_type = rel_type_names[raw_type] = raw_type.replace("-", "_").upper()
+        if track_existing:
+            existing.add((source, rel_type, target))
+        yield source, target, rel_type, relationship.get("comment")
+
+    if not track_existing:
+        return
+
+    doc_id = raw.get("SPDXID")
+    describes = []
+    for described in dict.fromkeys(document_describes or ()):
+        if (doc_id, "DESCRIBES", described) in existing or (described, "DESCRIBED_BY", doc_id) in existing:
+            continue
+        describes.append((doc_id, "DESCRIBES", described))
+        yield doc_id, described, "DESCRIBES", None
+    existing.update(describes)
+
+    for package in packages_with_files:
+        package_id = package.get("SPDXID")
+        for file_id in dict.fromkeys(package.get("hasFiles") or ()):
+            if (package_id, "CONTAINS", file_id) in existing or (file_id, "CONTAINED_BY", package_id) in existing:
+                continue
+            yield package_id, file_id, "CONTAINS", None
+
+
+def _iter_relationships(doc: Union["Document", Dict[str, Any]]) -> Iterator[Tuple[Any, Any, str, Any]]:
+    """
+    Yield (source ID, target ID, relationship type name, comment) per relationship.
+
+    Args:
+        doc: The SPDX document, or a raw document from load_spdx_json
+    """
+    if isinstance(doc, dict):
+        yield from _iter_raw_relationships(doc)
+        return
+
+    # Type name per relationship type; documents use only a handful
+    rel_type_names: Dict[Any, str] = {}
+    for relationship in doc.relationships:
+        relationship_type = relationship.relationship_type
+        rel_type = rel_type_names.get(relationship_type)
+        if rel_type is None:
+            # Get just the enum name, not the full "RelationshipType.VALUE" string
+            try:
+                rel_type = relationship_type.name
+            except AttributeError:
+                rel_type = str(relationship_type)
+            rel_type_names[relationship_type] = rel_type
+        # Relationship is a dataclass, so comment is always defined
+        yield relationship.spdx_element_id, relationship.related_spdx_element_id, rel_type, relationship.comment
+
+
+def extract_elements_from_document(doc: Union["Document", Dict[str, Any]], max_packages: int = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract all elements (packages, files, snippets) from the SPDX document.
+
+    Accepts either a parsed Document or a raw document from load_spdx_json.
+    Packages beyond max_packages are skipped without being extracted.
+    """
+    return dict(_iter_elements(doc, max_packages))
+
+
+# Fixed text opening and closing every diagram
+_HEADER = "graph LR\n"
+_LEGEND = (
+    "\n"
+    "    %% Legend\n"
+    '    legend["Legend:<br/>Blue = Document<br/>Purple = Package (APPLICATION)<br/>Orange = Package (SOURCE)<br/>Green = File<br/>Orange = Snippet"]\n'
+    "    style legend fill:#fafafa,stroke:#666,stroke-width:1px,stroke-dasharray: 5 5"
+)
+
+# Style attributes per element type; packages are further keyed by purpose
+_STYLES = {
+    "Document": "fill:#e1f5ff,stroke:#01579b,stroke-width:3px",
+    # Orange/amber for SOURCE packages (build specifications)
+    "Package_SOURCE": "fill:#fff3e0,stroke:#e65100,stroke-width:2px",
+    # Purple for APPLICATION packages (runtime artifacts)
+    "Package_APPLICATION": "fill:#f3e5f5,stroke:#4a148c,stroke-width:2px",
+    # Default purple for packages without purpose specified
+    "Package": "fill:#f3e5f5,stroke:#4a148c,stroke-width:2px",
+    "File": "fill:#e8f5e9,stroke:#1b5e20,stroke-width:2px",
+    "Snippet": "fill:#fff3e0,stroke:#e65100,stroke-width:2px",
+}
+
+
+def write_mermaid_diagram(doc: Union["Document", Dict[str, Any]], out: TextIO, compact: bool = False, max_packages: int = None, exclude_external_refs: bool = False) -> None:
+    """
+    Write a comprehensive Mermaid diagram for an SPDX document to a text stream.
+
+    The diagram is written incrementally as elements and relationships are
+    visited, so it is never held in memory as a whole.
 
     Args:
-        doc: The SPDX document to visualize
+        doc: The SPDX document to visualize, or a raw document from load_spdx_json
+        out: Text stream to write the diagram to
         compact: If True, generate compact output with fewer fields
         max_packages: Maximum number of packages to include (None for all)
         exclude_external_refs: If True, exclude external references from labels
     """
-    elements = extract_elements_from_document(doc)
-
-    # Limit packages if requested
-    if max_packages is not None:
-        package_elements = {k: v for k, v in elements.items() if v["type"] == "Package"}
-        if len(package_elements) > max_packages:
-            # Keep document element and limit packages
-            limited_packages = dict(list(package_elements.items())[:max_packages])
-            elements = {k: v for k, v in elements.items() if v["type"] != "Package"}
-            elements.update(limited_packages)
+    write = out.write
 
     # Start the Mermaid diagram with left-right orientation
-    lines = ["graph LR"]
+    write(_HEADER)
 
-    # Track which nodes we've added to avoid duplicates
-    added_nodes: Set[str] = set()
+    # Sanitized node ID per SPDX ID, reused for relationship endpoints
+    node_ids: Dict[str, str] = {}
 
-    # Add all element nodes
-    for element_id, element_data in elements.items():
-        node_id = sanitize_node_id(element_id)
+    # Fragments of the node currently being written
+    parts: List[str] = []
+
+    # Add all element nodes, streaming each element straight into the output
+    for element_id, element_data in _iter_elements(doc, max_packages):
+        node_id = node_ids[element_id] = sanitize_node_id(element_id)
         element_type = element_data["type"]
-        label = format_node_label(element_id, element_data, element_type, compact=compact, exclude_external_refs=exclude_external_refs)
 
-        # Use different shapes for different element types
-        if element_type == "Document":
-            lines.append(f'    {node_id}["{label}"]')
-            lines.append(
-                f"    style {node_id} fill:#e1f5ff,stroke:#01579b,stroke-width:3px"
-            )
-        elif element_type == "Package":
-            lines.append(f'    {node_id}["{label}"]')
-            # Color code based on package purpose
+        parts.append(f'    {node_id}["')
+        _append_node_label(parts, element_id, element_data, element_type, compact=compact, exclude_external_refs=exclude_external_refs)
+        parts.append('"]\n')
+
+        # Color code by element type, and packages by purpose
+        if element_type == "Package":
             purpose = element_data.get("primaryPackagePurpose")
-            if purpose and "SOURCE" in str(purpose):
-                # Orange/amber for SOURCE packages (build specifications)
-                lines.append(
-                    f"    style {node_id} fill:#fff3e0,stroke:#e65100,stroke-width:2px"
-                )
-            elif purpose and "APPLICATION" in str(purpose):
-                # Purple for APPLICATION packages (runtime artifacts)
-                lines.append(
-                    f"    style {node_id} fill:#f3e5f5,stroke:#4a148c,stroke-width:2px"
-                )
+            if purpose and "SOURCE" in purpose:
+                style_key = "Package_SOURCE"
+            elif purpose and "APPLICATION" in purpose:
+                style_key = "Package_APPLICATION"
             else:
-                # Default purple for packages without purpose specified
-                lines.append(
-                    f"    style {node_id} fill:#f3e5f5,stroke:#4a148c,stroke-width:2px"
-                )
-        elif element_type == "File":
-            lines.append(f'    {node_id}["{label}"]')
-            lines.append(
-                f"    style {node_id} fill:#e8f5e9,stroke:#1b5e20,stroke-width:2px"
-            )
-        elif element_type == "Snippet":
-            lines.append(f'    {node_id}["{label}"]')
-            lines.append(
-                f"    style {node_id} fill:#fff3e0,stroke:#e65100,stroke-width:2px"
-            )
+                style_key = "Package"
+        else:
+            style_key = element_type
+        parts.append(f"    style {node_id} {_STYLES[style_key]}\n")
 
-        added_nodes.add(node_id)
+        # One write per node: joining the fragments in C is much cheaper than
+        # passing them to writelines, which calls write once per fragment
+        write("".join(parts))
+        parts.clear()
 
     # Add relationships with full annotations
-    for relationship in doc.relationships:
-        source_id = sanitize_node_id(relationship.spdx_element_id)
-        target_id = sanitize_node_id(relationship.related_spdx_element_id)
-        # Get just the enum name, not the full "RelationshipType.VALUE" string
-        rel_type = relationship.relationship_type.name if hasattr(relationship.relationship_type, 'name') else str(relationship.relationship_type)
+    for source, target, rel_type, comment in _iter_relationships(doc):
+        source_id = _lookup_node_id(node_ids, source)
+        target_id = _lookup_node_id(node_ids, target)
 
         # Add comment to relationship if present
-        if hasattr(relationship, "comment") and relationship.comment:
-            comment = escape_quotes(relationship.comment)
+        if comment:
+            comment = escape_quotes(comment)
             edge_label = f"{rel_type}<br/>{comment}"
         else:
             edge_label = rel_type
 
-        # Create the edge with label
+        # Create the edge with label, formatted into a single write
         # For GENERATED_FROM: keep natural direction (generated element points to source)
-        lines.append(f'    {source_id} -->|"{edge_label}"| {target_id}')
+        write(f'    {source_id} -->|"{edge_label}"| {target_id}\n')
 
     # Add legend
-    lines.append("")
-    lines.append("    %% Legend")
-    lines.append(
-        '    legend["Legend:<br/>Blue = Document<br/>Purple = Package (APPLICATION)<br/>Orange = Package (SOURCE)<br/>Green = File<br/>Orange = Snippet"]'
-    )
-    lines.append(
-        "    style legend fill:#fafafa,stroke:#666,stroke-width:1px,stroke-dasharray: 5 5"
+    write(_LEGEND)
+
+
+def generate_mermaid_diagram(doc: Union["Document", Dict[str, Any]], compact: bool = False, max_packages: int = None, exclude_external_refs: bool = False) -> str:
+    """
+    Generate a comprehensive Mermaid diagram from an SPDX document.
+
+    Args:
+        doc: The SPDX document to visualize, or a raw document from load_spdx_json
+        compact: If True, generate compact output with fewer fields
+        max_packages: Maximum number of packages to include (None for all)
+        exclude_external_refs: If True, exclude external references from labels
+    """
+    out = io.StringIO()
+    write_mermaid_diagram(
+        doc,
+        out,
+        compact=compact,
+        max_packages=max_packages,
+        exclude_external_refs=exclude_external_refs
     )
+    return out.getvalue()
+
+
+def _non_negative_int(value: str) -> int:
+    """argparse type for options that must be at least 0."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {number}")
+    return number
+
+
+def _write_output(output: Path, write: Callable[[TextIO], None]) -> None:
+    """
+    Write a diagram to `output` with `write`, replacing a regular file only
+    once the whole diagram has been written.
 
-    return "\n".join(lines)
+    The diagram is streamed into a temp file next to the real target (the
+    file a symlinked output points to) and renamed over it at the end, so a
+    failure never leaves a partial diagram or clobbers an old one. Other
+    targets, such as /dev/stdout, are written to directly.
+    """
+    try:
+        existing = os.stat(output)
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and not stat.S_ISREG(existing.st_mode):
+        with open(output, 'w', encoding='utf-8', buffering=_IO_BUFFER_SIZE) as out:
+            write(out)
+        return
+
+    target = output.resolve()
+    with tempfile.NamedTemporaryFile(
+        mode='w',
+        encoding='utf-8',
+        buffering=_IO_BUFFER_SIZE,
+        dir=target.parent,
+        prefix=f".{target.name}.",
+        suffix='.tmp',
+        delete=False
+    ) as out:
+        tmp_path = Path(out.name)
+        try:
+            write(out)
+            out.close()
+            if existing is not None:
+                # Keep the mode and, where permitted, the ownership of the
+                # file being replaced
+                os.chmod(tmp_path, stat.S_IMODE(existing.st_mode))
+                try:
+                    os.chown(tmp_path, existing.st_uid, existing.st_gid)
+                except PermissionError:
+                    pass
+            else:
+                # NamedTemporaryFile creates the file as 0600; give it the
+                # permissions a plain open() would have
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, target)
+        except BaseException:
+            out.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
 
 
 def main():
@@ -522,7 +1123,7 @@ def main():
     )
     parser.add_argument(
         "--max-packages",
-        type=int,
+        type=_non_negative_int,
         help="Limit the number of packages to include in the diagram",
     )
     parser.add_argument(
@@ -530,6 +1131,12 @@ def main():
         action="store_true",
         help="Exclude external references (CPE, PURL) from labels",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Read JSON input directly instead of through the spdx-tools object model "
+        "(much faster on large SBOMs, but only the fields shown in the diagram are validated)",
+    )
 
     args = parser.parse_args()
 
@@ -539,33 +1146,35 @@ def main():
         sys.exit(1)
 
     try:
-        # Preprocess the file to fix common issues
-        processed_file = preprocess_spdx_file(args.spdx_file)
-
-        # Parse the SPDX file
-        doc = parse_file(str(processed_file))
+        if args.fast and args.spdx_file.suffix.lower() == '.json':
+            # Fast path: read the JSON directly, bypassing the object model
+            doc = load_spdx_json(args.spdx_file)
+        else:
+            # Parse the SPDX file, fixing common issues in JSON input first
+            doc = _parse_spdx_file(args.spdx_file)
 
-        # Clean up temp file if one was created
-        if processed_file != args.spdx_file:
-            try:
-                processed_file.unlink()
-            except:
-                pass
-
-        # Generate Mermaid diagram
-        mermaid = generate_mermaid_diagram(
-            doc,
-            compact=args.compact,
-            max_packages=args.max_packages,
-            exclude_external_refs=args.exclude_external_refs
-        )
-
-        # Output to file or stdout
+        # Stream the Mermaid diagram to file or stdout
         if args.output:
-            args.output.write_text(mermaid)
+            _write_output(
+                args.output,
+                functools.partial(
+                    write_mermaid_diagram,
+                    doc,
+                    compact=args.compact,
+                    max_packages=args.max_packages,
+                    exclude_external_refs=args.exclude_external_refs
+                )
+            )
             print(f"Diagram written to {args.output}")
         else:
-            print(mermaid)
+            write_mermaid_diagram(
+                doc,
+                sys.stdout,
+                compact=args.compact,
+                max_packages=args.max_packages,
+                exclude_external_refs=args.exclude_external_refs
+            )
+            print()
 
     except Exception as e:
         print(f"Error processing SPDX file: {e}", file=sys.stderr)
@@ -0,0 +1,44 @@
+"""
+Shared fixtures for SPDX to Mermaid converter tests.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path; conftest.py is loaded before any test module, so this
+# covers every test's spdx_to_mermaid import
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from spdx_to_mermaid import _parse_spdx_file
+
+
+# Test data paths
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+
+def _parse_asset(name: str):
+    """Parse a test asset with spdx-tools, fixing timestamps first if needed."""
+    return _parse_spdx_file(ASSETS_DIR / name)
+
+
+# Parsing with spdx-tools dominates test run time, so each asset is parsed
+# once per session; tests must not modify the returned documents.
+@pytest.fixture(scope="session")
+def flox_git_doc():
+    return _parse_asset("flox-git.spdx.json")
+
+
+@pytest.fixture(scope="session")
+def git_doc():
+    return _parse_asset("git-2.51.2.spdx.json")
+
+
+@pytest.fixture(scope="session")
+def syft_doc():
+    return _parse_asset("syft_spdx.json")
+
+
+@pytest.fixture(scope="session")
+def nix2sbom_doc():
+    return _parse_asset("nix2sbom.spdx.json")
@@ -3,12 +3,9 @@
 Tests for SPDX to Mermaid converter.
 """
 
+import json
 import pytest
 from pathlib import Path
-import sys
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from spdx_to_mermaid import (
     sanitize_node_id,
@@ -16,7 +13,12 @@ from spdx_to_mermaid import (
     format_node_label,
     extract_elements_from_document,
     generate_mermaid_diagram,
+    main,
+    load_spdx_json,
+    preprocess_spdx_file,
+    _parse_spdx_file,
 )
+from spdx_tools.spdx.parser.error import SPDXParsingError
 from spdx_tools.spdx.parser.parse_anything import parse_file
 
 
@@ -69,26 +71,36 @@ class TestDocumentParsing:
 
     def test_parse_nix2sbom_spdx(self):
         """Test parsing nix2sbom SPDX file with timestamp preprocessing."""
-        from spdx_to_mermaid import preprocess_spdx_file
-
-        # Preprocess the file to fix timestamp issues
-        processed_file = preprocess_spdx_file(NIX2SBOM_SPDX)
-
-        # Parse the preprocessed file
-        doc = parse_file(str(processed_file))
-
-        # Clean up temp file if created
-        if processed_file != NIX2SBOM_SPDX:
-            processed_file.unlink()
+        doc = _parse_spdx_file(NIX2SBOM_SPDX)
 
         assert doc is not None
         assert doc.creation_info is not None
         assert len(doc.packages) > 0
 
-    def test_extract_elements(self):
+    def test_preprocess_spdx_file(self, tmp_path):
+        """Test that preprocessing only writes a temp file when timestamps need fixing."""
+        fixed = tmp_path / "fixed.spdx.json"
+        fixed.write_bytes(b'{"created": "2025-11-27T15:17:19Z", "SPDXID": "SPDXRef-DOCUMENT"}')
+        assert preprocess_spdx_file(fixed) == fixed
+
+        empty = tmp_path / "empty.spdx.json"
+        empty.write_bytes(b"")
+        assert preprocess_spdx_file(empty) == empty
+
+        broken = tmp_path / "broken.spdx.json"
+        broken.write_bytes(b'{"created": "2025-11-27T15:17:19", "other": "2025-11-28T00:00:00"}')
+        processed_file = preprocess_spdx_file(broken)
+        try:
+            assert processed_file != broken
+            assert processed_file.read_bytes() == (
+                b'{"created": "2025-11-27T15:17:19Z", "other": "2025-11-28T00:00:00Z"}'
+            )
+        finally:
+            processed_file.unlink()
+
+    def test_extract_elements(self, flox_git_doc):
         """Test element extraction from document."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        elements = extract_elements_from_document(doc)
+        elements = extract_elements_from_document(flox_git_doc)
 
         # Should have document element
         assert "SPDXRef-DOCUMENT" in elements
@@ -100,10 +112,17 @@ class TestDocumentParsing:
         }
         assert len(package_elements) > 0
 
-    def test_package_purpose_extraction(self):
+    def test_extract_elements_max_packages(self, git_doc):
+        """Test limiting the number of extracted packages."""
+        elements = extract_elements_from_document(git_doc, max_packages=2)
+
+        package_elements = [v for v in elements.values() if v["type"] == "Package"]
+        assert len(package_elements) == 2
+        assert "SPDXRef-DOCUMENT" in elements
+
+    def test_package_purpose_extraction(self, flox_git_doc):
         """Test that package purpose is extracted."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        elements = extract_elements_from_document(doc)
+        elements = extract_elements_from_document(flox_git_doc)
 
         # Check for SOURCE and APPLICATION packages
         purposes = [
@@ -119,10 +138,9 @@ class TestDocumentParsing:
 class TestMermaidGeneration:
     """Test Mermaid diagram generation."""
 
-    def test_generate_flox_git_diagram(self):
+    def test_generate_flox_git_diagram(self, flox_git_doc):
         """Test generating diagram for flox-git SPDX."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(flox_git_doc)
 
         assert mermaid.startswith("graph LR")
         assert "DOCUMENT" in mermaid
@@ -132,46 +150,41 @@ class TestMermaidGeneration:
         assert "style" in mermaid
         assert "fill:" in mermaid
 
-    def test_generate_git_diagram(self):
+    def test_generate_git_diagram(self, git_doc):
         """Test generating diagram for git SPDX."""
-        doc = parse_file(str(GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(git_doc)
 
         assert mermaid.startswith("graph LR")
         assert "DOCUMENT" in mermaid
 
-    def test_package_purpose_styling(self):
+    def test_package_purpose_styling(self, flox_git_doc):
         """Test that packages are styled based on purpose."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(flox_git_doc)
 
         # Should have different colors for SOURCE and APPLICATION
         # Orange for SOURCE: #fff3e0
         # Purple for APPLICATION: #f3e5f5
         assert "#fff3e0" in mermaid or "#f3e5f5" in mermaid
 
-    def test_generated_from_relationships(self):
+    def test_generated_from_relationships(self, flox_git_doc):
         """Test GENERATED_FROM relationship direction."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(flox_git_doc)
 
         # Should have GENERATED_FROM relationships
         if "GENERATED_FROM" in mermaid:
             # Check that arrows exist in output
             assert "-->" in mermaid
 
-    def test_relationship_labels(self):
+    def test_relationship_labels(self, flox_git_doc):
         """Test that relationships have labels."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(flox_git_doc)
 
         # Should have relationship type labels
         assert "|" in mermaid  # Mermaid edge label syntax
 
-    def test_summary_in_labels(self):
+    def test_summary_in_labels(self, flox_git_doc):
         """Test that summary field is included in labels."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        elements = extract_elements_from_document(doc)
+        elements = extract_elements_from_document(flox_git_doc)
 
         # Find a package with summary
         for elem_id, elem_data in elements.items():
@@ -180,10 +193,9 @@ class TestMermaidGeneration:
                 assert "Summary:" in label
                 break
 
-    def test_license_comments_in_labels(self):
+    def test_license_comments_in_labels(self, flox_git_doc):
         """Test that license comments are included in labels."""
-        doc = parse_file(str(FLOX_GIT_SPDX))
-        elements = extract_elements_from_document(doc)
+        elements = extract_elements_from_document(flox_git_doc)
 
         # Find a package with license comments
         for elem_id, elem_data in elements.items():
@@ -196,13 +208,196 @@ class TestMermaidGeneration:
                 break
 
 
+class TestJsonFastPath:
+    """Test generating diagrams from raw SPDX JSON without spdx-tools models."""
+
+    def test_extract_elements_from_raw_json(self, flox_git_doc):
+        """Test element extraction from a raw JSON document."""
+        raw = load_spdx_json(FLOX_GIT_SPDX)
+        elements = extract_elements_from_document(raw)
+
+        assert elements["SPDXRef-DOCUMENT"]["type"] == "Document"
+        assert elements == extract_elements_from_document(flox_git_doc)
+
+    @pytest.mark.parametrize(
+        "spdx_file, doc_fixture",
+        [
+            (FLOX_GIT_SPDX, "flox_git_doc"),
+            (GIT_SPDX, "git_doc"),
+            (SYFT_SPDX, "syft_doc"),
+            (NIX2SBOM_SPDX, "nix2sbom_doc"),
+        ],
+        ids=["flox-git", "git", "syft", "nix2sbom"],
+    )
+    def test_raw_json_matches_parsed_document(self, spdx_file, doc_fixture, request):
+        """Test that the fast path renders the same diagram as the full parse."""
+        doc = request.getfixturevalue(doc_fixture)
+        raw = load_spdx_json(spdx_file)
+
+        assert generate_mermaid_diagram(raw) == generate_mermaid_diagram(doc)
+        assert generate_mermaid_diagram(raw, compact=True, max_packages=3) == generate_mermaid_diagram(
+            doc, compact=True, max_packages=3
+        )
+
+    def test_raw_json_normalizes_licenses(self, tmp_path):
+        """Test that the fast path renders license expressions like spdx-tools."""
+        spdx_file = tmp_path / "synthetic.spdx.json"
+        spdx_file.write_text(json.dumps(_synthetic_sbom()))
+
+        raw = load_spdx_json(spdx_file)
+        elements = extract_elements_from_document(raw)
+
+        assert elements["SPDXRef-lower"]["licenseConcluded"] == "MIT"
+        assert elements["SPDXRef-lower"]["licenseDeclared"] == "NOASSERTION"
+        assert elements["SPDXRef-or"]["licenseConcluded"] == "Apache-2.0 OR MIT"
+        assert elements["SPDXRef-precedence"]["licenseConcluded"] == "MIT OR (Apache-2.0 AND BSD-2-Clause)"
+        assert generate_mermaid_diagram(raw) == generate_mermaid_diagram(parse_file(str(spdx_file)))
+
+    def test_raw_json_normalizes_actors(self, tmp_path):
+        """Test that the fast path renders actors and timestamps like spdx-tools."""
+        spdx_file = tmp_path / "synthetic.spdx.json"
+        spdx_file.write_text(json.dumps(_synthetic_sbom()))
+
+        raw = load_spdx_json(spdx_file)
+        elements = extract_elements_from_document(raw)
+
+        assert elements["SPDXRef-DOCUMENT"]["created"] == "2025-01-01 00:00:00"
+        assert elements["SPDXRef-DOCUMENT"]["creators"] == (
+            "Tool: test, Person: Jane Doe, Organization: Example (info@example.com)"
+        )
+        assert elements["SPDXRef-lower"]["supplier"] == "Organization: Foo"
+        assert elements["SPDXRef-lower"]["originator"] == "Person: Jane Doe (jane@example.com)"
+        assert elements["SPDXRef-or"]["supplier"] == "NOASSERTION"
+        assert generate_mermaid_diagram(raw) == generate_mermaid_diagram(parse_file(str(spdx_file)))
+
+    @pytest.mark.parametrize(
+        "path, field",
+        [
+            (("packages", 0), "name"),
+            (("packages", 0), "downloadLocation"),
+            (("packages", 0, "externalRefs", 0), "referenceLocator"),
+            (("packages", 1, "checksums", 0), "checksumValue"),
+            (("files", 0), "fileName"),
+            (("relationships", 0), "relatedSpdxElement"),
+            (("creationInfo",), "created"),
+        ],
+    )
+    def test_raw_json_missing_required_field(self, tmp_path, path, field):
+        """Test that the fast path rejects missing fields like spdx-tools does."""
+        sbom = _synthetic_sbom()
+        element = sbom
+        for key in path:
+            element = element[key]
+        del element[field]
+        spdx_file = tmp_path / "synthetic.spdx.json"
+        spdx_file.write_text(json.dumps(sbom))
+
+        with pytest.raises(SPDXParsingError):
+            parse_file(str(spdx_file))
+        with pytest.raises(SPDXParsingError):
+            generate_mermaid_diagram(load_spdx_json(spdx_file))
+
+    @pytest.mark.parametrize(
+        "path, field, value",
+        [
+            (("packages", 0), "licenseConcluded", "MIT OR ("),
+            (("packages", 0), "supplier", "Foo Inc."),
+            (("packages", 0), "originator", "Person: (jane@example.com)"),
+            (("creationInfo",), "creators", ["Tool:"]),
+            (("creationInfo",), "created", "2025-01-01T00:00:00.5Z"),
+            (("creationInfo",), "created", "2025-01-01"),
+        ],
+    )
+    def test_raw_json_invalid_value(self, tmp_path, path, field, value):
+        """Test that the fast path rejects malformed values like spdx-tools does."""
+        sbom = _synthetic_sbom()
+        element = sbom
+        for key in path:
+            element = element[key]
+        element[field] = value
+        spdx_file = tmp_path / "synthetic.spdx.json"
+        spdx_file.write_text(json.dumps(sbom))
+
+        with pytest.raises(SPDXParsingError):
+            parse_file(str(spdx_file))
+        with pytest.raises(SPDXParsingError):
+            generate_mermaid_diagram(load_spdx_json(spdx_file))
+
+
+def _synthetic_sbom():
+    """Build a small SPDX JSON document with non-canonical license expressions and actors."""
+    return {
+        "spdxVersion": "SPDX-2.3",
+        "dataLicense": "CC0-1.0",
+        "SPDXID": "SPDXRef-DOCUMENT",
+        "name": "synthetic",
+        "documentNamespace": "https://example.com/synthetic",
+        "creationInfo": {
+            "created": "2025-01-01T00:00:00Z",
+            "creators": ["Tool:test", "Person: Jane Doe ()", "Organization:Example (info@example.com)"],
+        },
+        "packages": [
+            {
+                "SPDXID": "SPDXRef-lower",
+                "name": "lower",
+                "downloadLocation": "NOASSERTION",
+                "licenseConcluded": "mit",
+                "licenseDeclared": "noassertion",
+                "supplier": "Organization:Foo",
+                "originator": "Person:  Jane Doe  (jane@example.com)",
+                "externalRefs": [
+                    {
+                        "referenceCategory": "PACKAGE-MANAGER",
+                        "referenceType": "purl",
+                        "referenceLocator": "pkg:generic/lower@1.0",
+                    }
+                ],
+            },
+            {
+                "SPDXID": "SPDXRef-or",
+                "name": "or",
+                "downloadLocation": "NOASSERTION",
+                "licenseConcluded": "Apache-2.0 or MIT",
+                "supplier": "NOASSERTION",
+                "checksums": [{"algorithm": "SHA256", "checksumValue": "0" * 64}],
+            },
+            {
+                "SPDXID": "SPDXRef-precedence",
+                "name": "precedence",
+                "downloadLocation": "NOASSERTION",
+                "licenseConcluded": "MIT OR Apache-2.0 AND BSD-2-Clause",
+                "licenseDeclared": "(gpl-2.0+)",
+            },
+        ],
+        "files": [
+            {
+                "SPDXID": "SPDXRef-file",
+                "fileName": "./src/main.c",
+                "checksums": [{"algorithm": "SHA1", "checksumValue": "0" * 40}],
+                "licenseConcluded": "bsd-2-clause and (mit or apache-2.0)",
+            }
+        ],
+        "relationships": [
+            {
+                "spdxElementId": "SPDXRef-DOCUMENT",
+                "relationshipType": "DESCRIBES",
+                "relatedSpdxElement": "SPDXRef-lower",
+            },
+            {
+                "spdxElementId": "SPDXRef-or",
+                "relationshipType": "CONTAINS",
+                "relatedSpdxElement": "SPDXRef-file",
+            },
+        ],
+    }
+
+
 class TestEdgeCases:
     """Test edge cases and error handling."""
 
-    def test_empty_relationships(self):
+    def test_empty_relationships(self, git_doc):
         """Test handling documents with few relationships."""
-        doc = parse_file(str(GIT_SPDX))
-        mermaid = generate_mermaid_diagram(doc)
+        mermaid = generate_mermaid_diagram(git_doc)
 
         # Should still generate valid diagram
         assert mermaid.startswith("graph LR")
@@ -215,10 +410,41 @@ class TestEdgeCases:
         assert "-" not in result
         assert "." not in result
 
-    def test_long_text_truncation(self):
+    def test_format_node_label_unknown_type(self):
+        """Test that element types without a dedicated builder still get a label."""
+        label = format_node_label(
+            "SPDXRef-custom",
+            {"type": "Custom", "name": "custom", "version": "1.0", "comment": "note"},
+            "Custom",
+        )
+        assert label == "[Custom]\nName: custom\nVersion: 1.0\nComment: note"
+
+    def test_format_node_label_non_string_values(self):
+        """Test that non-string field values are converted instead of raising."""
+        label = format_node_label(
+            "SPDXRef-pkg",
+            {
+                "type": "Package",
+                "name": 42,
+                "version": 1.5,
+                "comment": ["a", "b"],
+                "checksums": [{"algorithm": "SHA1", "checksumValue": 1234567890123456}],
+            },
+            "Package",
+        )
+        assert "Name: 42" in label
+        assert "Version: 1.5" in label
+        assert "Comment: ['a', 'b']" in label
+        assert "SHA1: 123456789012..." in label
+
+        label = format_node_label(
+            "SPDXRef-DOCUMENT", {"type": "Document", "creators": ["Tool: a", "Person: b"]}, "Document"
+        )
+        assert "Creators: Tool: a, Person: b" in label
+
+    def test_long_text_truncation(self, syft_doc):
         """Test that long text fields are truncated."""
-        doc = parse_file(str(SYFT_SPDX))
-        elements = extract_elements_from_document(doc)
+        elements = extract_elements_from_document(syft_doc)
 
         # Generate labels and check for truncation indicators
         for elem_id, elem_data in elements.items():
@@ -228,5 +454,83 @@ class TestEdgeCases:
             assert len(label) > 0
 
 
+class TestCommandLine:
+    """Test the command line entry point."""
+
+    def test_max_packages_rejects_negative(self, monkeypatch, capsys):
+        """Test that a negative --max-packages is a usage error."""
+        monkeypatch.setattr(
+            "sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "--max-packages", "-1"]
+        )
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 2
+        assert "--max-packages: must be at least 0" in capsys.readouterr().err
+
+    def test_output_file(self, tmp_path, monkeypatch, syft_doc):
+        """Test writing the diagram to a new file with -o."""
+        output = tmp_path / "diagram.md"
+        monkeypatch.setattr("sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "-o", str(output)])
+
+        main()
+
+        assert output.read_text() == generate_mermaid_diagram(syft_doc)
+        assert sorted(tmp_path.iterdir()) == [output]
+
+    def test_output_file_keeps_mode(self, tmp_path, monkeypatch, syft_doc):
+        """Test that replacing an existing output keeps its permissions."""
+        output = tmp_path / "diagram.md"
+        output.write_text("old")
+        output.chmod(0o640)
+        monkeypatch.setattr("sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "-o", str(output)])
+
+        main()
+
+        assert output.read_text() == generate_mermaid_diagram(syft_doc)
+        assert output.stat().st_mode & 0o777 == 0o640
+
+    def test_output_symlink(self, tmp_path, monkeypatch, syft_doc):
+        """Test that a symlinked output is written through, keeping the link."""
+        target = tmp_path / "diagram.md"
+        target.write_text("old")
+        link = tmp_path / "link.md"
+        link.symlink_to(target)
+        monkeypatch.setattr("sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "-o", str(link)])
+
+        main()
+
+        assert link.is_symlink()
+        assert target.read_text() == generate_mermaid_diagram(syft_doc)
+        assert sorted(tmp_path.iterdir()) == [target, link]
+
+    def test_output_failure_keeps_old_file(self, tmp_path, monkeypatch):
+        """Test that a failure part-way through leaves the old output and no temp file."""
+        import spdx_to_mermaid
+
+        def fail_part_way(doc, out, **kwargs):
+            out.write("graph LR\n")
+            raise RuntimeError("boom")
+
+        output = tmp_path / "diagram.md"
+        output.write_text("old")
+        monkeypatch.setattr(spdx_to_mermaid, "write_mermaid_diagram", fail_part_way)
+        monkeypatch.setattr("sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "-o", str(output)])
+
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 1
+        assert output.read_text() == "old"
+        assert sorted(tmp_path.iterdir()) == [output]
+
+    def test_output_directory(self, tmp_path, monkeypatch):
+        """Test that an output path naming a directory fails without leaving a temp file."""
+        monkeypatch.setattr("sys.argv", ["spdx_to_mermaid", str(SYFT_SPDX), "-o", str(tmp_path)])
+
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+        assert excinfo.value.code == 1
+        assert list(tmp_path.iterdir()) == []
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])